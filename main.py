@@ -2,33 +2,292 @@
 GitLab to GOGS Backup Script
 
 This script backs up all repositories from a GitLab organization to GOGS.
-It reads credentials from environment variables and uses GitPython for git operations.
+It reads credentials from environment variables and runs the `git` CLI directly
+for clone/fetch/push operations.
 """
 
 from __future__ import annotations
 
+import base64
+import contextlib
+import errno
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import re
 import shutil
+import subprocess
 import sys
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
 
 import gitlab
 import requests
 from dotenv import load_dotenv
-from git import GitCommandError
-from git import Repo
-
-# Configure logging
-logging.basicConfig(
-    stream=sys.stdout,
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
 logger = logging.getLogger(__name__)
 
+TEXT_LOG_FORMAT = (
+    "%(asctime)s - %(name)s - %(threadName)s - %(levelname)s - %(message)s"
+)
+
+# Optional record attributes (passed via `extra=`) that JSON log lines include.
+LOG_CONTEXT_FIELDS = ("repo", "phase")
+
+DEFAULT_BACKUP_WORKERS = 8
+DEFAULT_HTTP_POOL_SIZE = 10
+GOGS_REPO_PAGE_LIMIT = 50
+GITLAB_PROJECTS_PER_PAGE = 100  # GraphQL connection maximum
+DEFAULT_STATE_PATH = ".backup_state.json"
+DEFAULT_GIT_TIMEOUT_SECONDS = 3600
+
+# A mirror clone needs room for the received pack plus its index and any
+# temporary files, so require this multiple of the repository size on tmpfs.
+TMPFS_SIZE_FACTOR = 4
+
+# Scratch mirrors are deleted right after the push, so skip fsync for them.
+SCRATCH_GIT_CONFIG = {"core.fsync": "none"}
+
+# GitLab refreshes `last_activity_at` at most once per hour, so activity inside
+# that window may not move the timestamp.
+GITLAB_ACTIVITY_THROTTLE = timedelta(hours=1)
+
+# Abort git HTTP transfers that stay below 1 KB/s for 2 minutes, so a stalled
+# clone/push fails (and is retried) instead of blocking a worker indefinitely.
+GIT_TRANSFER_ENV = {
+    "GIT_HTTP_LOW_SPEED_LIMIT": "1000",
+    "GIT_HTTP_LOW_SPEED_TIME": "120",
+}
+
+# Credentials are only ever sent as an `http.extraHeader`. If the server
+# rejects them, fail fast instead of prompting on the terminal (blocking a
+# worker until the git timeout) or falling back to a stored credential helper
+# identity. An empty `credential.helper` clears any configured helpers.
+GIT_NO_PROMPT_ENV = {"GIT_TERMINAL_PROMPT": "0"}
+GIT_NO_CREDENTIAL_HELPER_CONFIG = {"credential.helper": ""}
+
+# Matches the userinfo part of credentialed URLs (e.g. `https://user:token@`).
+URL_CREDENTIALS_PATTERN = re.compile(r"(?<=://)[^/@\s]+@")
+
+# Fetches only the project fields the backup consumes, one page at a time.
+GITLAB_PROJECTS_QUERY = """
+query ($fullPath: ID!, $first: Int!, $after: String) {
+  group(fullPath: $fullPath) {
+    projects(includeSubgroups: true, first: $first, after: $after) {
+      pageInfo {
+        endCursor
+        hasNextPage
+      }
+      nodes {
+        id
+        name
+        description
+        visibility
+        httpUrlToRepo
+        fullPath
+        lastActivityAt
+        archived
+        statistics {
+          repositorySize
+        }
+        repository {
+          empty
+        }
+      }
+    }
+  }
+}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class GitLabProject:
+    """GitLab project metadata needed to back up its repository."""
+
+    id: int
+    name: str
+    description: str | None
+    visibility: str
+    http_url_to_repo: str
+    path_with_namespace: str
+    last_activity_at: str | None
+    # In bytes; None when statistics are not visible to the token.
+    repository_size: int | None = None
+    # True when the repository has no commits (nothing to mirror).
+    empty_repo: bool = False
+
+    @classmethod
+    def from_graphql(cls, node: dict[str, Any]) -> GitLabProject:
+        """Build a project from a GraphQL ``Project`` node."""
+        repository_size = (node.get("statistics") or {}).get("repositorySize")
+        # `repository` is null when the token cannot read it
+        repository = node.get("repository") or {}
+        return cls(
+            # GraphQL IDs are global IDs such as "gid://gitlab/Project/42"
+            id=int(node["id"].rsplit("/", 1)[-1]),
+            name=node["name"],
+            description=node.get("description"),
+            visibility=node["visibility"],
+            http_url_to_repo=node["httpUrlToRepo"],
+            path_with_namespace=node["fullPath"],
+            last_activity_at=node.get("lastActivityAt"),
+            repository_size=None if repository_size is None else int(repository_size),
+            empty_repo=bool(repository.get("empty")),
+        )
+
+
+class GitCommandFailedError(RuntimeError):
+    """A git subprocess exited non-zero or timed out.
+
+    The message and ``stderr`` never contain URL credentials.
+    """
+
+    def __init__(self, message: str, stderr: str = "", *, timed_out: bool = False):
+        super().__init__(message)
+        self.stderr = stderr
+        self.timed_out = timed_out
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Format each log record as a single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in LOG_CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _configure_logging() -> logging.handlers.QueueListener:
+    """Send log records through a queue to a single stdout writer thread.
+
+    Worker threads only enqueue records, so they never contend on stdout.
+    ``LOG_FORMAT=json`` switches the output to one JSON object per line.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    if os.environ.get("LOG_FORMAT", "").strip().lower() == "json":
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+class RateLimitRetry(Retry):
+    """urllib3 ``Retry`` that also replays requests rejected with HTTP 429.
+
+    A rate-limited request was never processed by the server, so replaying it
+    is safe even for non-idempotent methods such as repository creation.
+    """
+
+    def is_retry(
+        self, method: str, status_code: int, has_retry_after: bool = False
+    ) -> bool:
+        if status_code == 429:
+            return bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def _is_out_of_space_error(error: BaseException) -> bool:
+    """Check whether an error was caused by a full filesystem."""
+    if isinstance(error, GitCommandFailedError):
+        return "no space left on device" in error.stderr.lower()
+    return isinstance(error, OSError) and error.errno == errno.ENOSPC
+
+
+def _redact_credentials(text: str) -> str:
+    """Mask credentials embedded in URLs."""
+    return URL_CREDENTIALS_PATTERN.sub("***@", text)
+
+
+def _basic_auth_header(username: str, password: str) -> str:
+    """Build an HTTP Basic ``Authorization`` header line."""
+    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return f"Authorization: Basic {credentials}"
+
+
+def _git_config_env(config: dict[str, str]) -> dict[str, str]:
+    """Express git config entries as ``GIT_CONFIG_*`` environment variables.
+
+    Unlike ``git -c``, values passed this way do not show up in process
+    listings.
+    """
+    env = {"GIT_CONFIG_COUNT": str(len(config))}
+    for idx, (key, value) in enumerate(config.items()):
+        env[f"GIT_CONFIG_KEY_{idx}"] = key
+        env[f"GIT_CONFIG_VALUE_{idx}"] = value
+    return env
+
+
+def _gogs_repo_owner(repo: dict[str, Any]) -> str:
+    """Return the lowercased owner name of a GOGS API repository object."""
+    owner = (repo.get("owner") or {}).get("username")
+    if not owner:
+        owner = repo.get("full_name", "").partition("/")[0]
+    return owner.lower()
+
+
+def _get_positive_int_env(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to a default."""
+    raw_value = os.environ.get(name, "").strip()
+    if not raw_value:
+        return default
+
+    try:
+        value = int(raw_value)
+    except ValueError:
+        raise ValueError(
+            f"Environment variable {name} must be an integer, got '{raw_value}'"
+        ) from None
+
+    if value < 1:
+        raise ValueError(f"Environment variable {name} must be >= 1, got {value}")
+
+    return value
+
+
+def _get_bool_env(name: str) -> bool:
+    """Read a boolean flag from the environment (unset means False)."""
+    return os.environ.get(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _parse_gitlab_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp returned by the GitLab API."""
+    return datetime.fromisoformat(value)
+
 
 class GitLabToGOGSBackup:
     """Handles backing up GitLab repositories to GOGS."""
@@ -46,20 +305,82 @@ class GitLabToGOGSBackup:
         self.gogs_token = os.environ.get("GOGS_ACCESS_TOKEN", "")
         self.gogs_org = os.environ.get("GOGS_ORG", "")  # Optional: organization name
 
+        # Concurrency configuration
+        self.max_workers = _get_positive_int_env(
+            "BACKUP_WORKERS", DEFAULT_BACKUP_WORKERS
+        )
+
+        # Optional cap on git's pack compression/indexing threads per git
+        # process (unset keeps git's default of one thread per CPU)
+        self.git_pack_threads = _get_positive_int_env("BACKUP_GIT_PACK_THREADS", 0)
+
+        # Incremental backup state
+        self.state_path = Path(os.environ.get("BACKUP_STATE_PATH", DEFAULT_STATE_PATH))
+        self.force_full_backup = _get_bool_env("BACKUP_FORCE")
+
+        # Per git subprocess timeout, so one hung repo cannot starve a worker
+        self.git_timeout = _get_positive_int_env(
+            "BACKUP_GIT_TIMEOUT", DEFAULT_GIT_TIMEOUT_SECONDS
+        )
+
+        # Optional RAM-backed scratch space for temporary mirrors (opt-in, since
+        # tmpfs pages count against the container memory limit)
+        tmpfs_dir = os.environ.get("BACKUP_TMPFS_DIR", "").strip()
+        self.tmpfs_dir = Path(tmpfs_dir) if tmpfs_dir else None
+        self._tmpfs_lock = threading.Lock()
+        self._tmpfs_reserved_bytes = 0
+
+        # Optional persistent mirror cache (disabled when unset)
+        cache_dir = os.environ.get("BACKUP_CACHE_DIR", "").strip()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_max_bytes = _get_positive_int_env("BACKUP_CACHE_MAX_GB", 0) * (
+            1024**3
+        )
+
         # Validate required environment variables
         self._validate_config()
 
+        # Precompute git HTTP credentials and the GOGS repository URLs once
+        self._gitlab_git_auth_header = _basic_auth_header("oauth2", self.gitlab_token)
+        self._gogs_git_auth_header = _basic_auth_header(
+            self.gogs_username, self.gogs_token
+        )
+        gogs_owner = self.gogs_org or self.gogs_username
+        self._gogs_repo_base_url = f"{self.gogs_url}/{gogs_owner}"
+        # GOGS creates organization repos under /org/{orgname}/repos (singular)
+        if self.gogs_org:
+            self._gogs_create_repo_endpoint = f"/org/{self.gogs_org}/repos"
+        else:
+            self._gogs_create_repo_endpoint = "/user/repos"
+
         # Log configuration (mask sensitive data)
-        logger.info(f"GitLab URL: {self.gitlab_url}")
-        logger.info(f"GitLab Group ID: {self.gitlab_group_id}")
-        logger.info(f"GOGS URL: {self.gogs_url}")
-        logger.info(f"GOGS Username: {self.gogs_username}")
+        logger.info("GitLab URL: %s", self.gitlab_url)
+        logger.info("GitLab Group ID: %s", self.gitlab_group_id)
+        logger.info("GOGS URL: %s", self.gogs_url)
+        logger.info("GOGS Username: %s", self.gogs_username)
         logger.info(
-            f"GOGS Organization: '{self.gogs_org}' (empty means personal repos)"
+            "GOGS Organization: '%s' (empty means personal repos)", self.gogs_org
+        )
+        logger.info("Backup Workers: %s", self.max_workers)
+        logger.info(
+            "Git Pack Threads per Process: %s", self.git_pack_threads or "(git default)"
+        )
+        logger.info("Backup State Path: %s", self.state_path)
+        logger.info("Force Full Backup: %s", self.force_full_backup)
+        logger.info("Git Operation Timeout: %ss", self.git_timeout)
+        logger.info("Tmpfs Scratch Dir: %s", self.tmpfs_dir or "(disabled)")
+        logger.info("Mirror Cache Dir: %s", self.cache_dir or "(disabled)")
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Initialize GitLab client. It is only used from the main thread (group
+        # lookup and GraphQL listing), so its default session is sufficient.
+        self.gl = gitlab.Gitlab(
+            self.gitlab_url,
+            private_token=self.gitlab_token,
+            retry_transient_errors=True,
         )
-
-        # Initialize GitLab client
-        self.gl = gitlab.Gitlab(self.gitlab_url, private_token=self.gitlab_token)
         self.gl.auth()
 
         # GOGS API headers
@@ -68,148 +389,305 @@ class GitLabToGOGSBackup:
             "Content-Type": "application/json",
         }
 
-        # Verify GOGS organization exists if specified
+        # Shared GOGS API session so connections are reused across requests and
+        # worker threads. The pool is sized so every worker can hold a connection.
+        self.session = self._build_gogs_session()
+
+        # Load existing GOGS repository names once instead of probing per repo.
+        # Names are stored lowercased since GOGS repo names are case-insensitive.
+        # In organization mode the listing doubles as the organization access
+        # check, so startup costs no extra round trip to GOGS.
+        self._gogs_repo_lock = threading.Lock()
+        try:
+            self._gogs_repo_set = self._load_gogs_repo_set()
+        except requests.exceptions.HTTPError as e:
+            if self.gogs_org:
+                self._raise_gogs_org_error(e)
+            raise
+
         if self.gogs_org:
-            self._verify_gogs_org_exists()
+            logger.info("Verified organization '%s' exists in GOGS", self.gogs_org)
+
+    def _build_http_session(self, max_retries: Retry | int = 0) -> requests.Session:
+        """Create a session that keeps an idle connection per worker thread."""
+        session = requests.Session()
+        pool_size = max(self.max_workers, DEFAULT_HTTP_POOL_SIZE)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=max_retries,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _build_gogs_session(self) -> requests.Session:
+        """Create a pooled GOGS API session with retries for transient errors."""
+        # Non-idempotent methods (POST) are only replayed after a 429, so repo
+        # creation is never duplicated. `Retry-After` is honored when present;
+        # otherwise retries back off exponentially. `raise_on_status=False`
+        # keeps the final response so callers still get an `HTTPError` from
+        # `raise_for_status()`.
+        retry = RateLimitRetry(
+            total=6,
+            backoff_factor=1.5,
+            status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        session = self._build_http_session(max_retries=retry)
+        session.headers.update(self.gogs_headers)
+        return session
 
-    def _is_retryable_gitlab_error(self, error: Exception) -> bool:
-        """Determine whether a GitLab/API error should be retried."""
-        if isinstance(error, requests.exceptions.RequestException):
+    def _is_retryable_git_error(self, error: GitCommandFailedError) -> bool:
+        """Determine whether a git clone/fetch/push error appears transient."""
+        if error.timed_out:
             return True
 
-        if isinstance(error, gitlab.GitlabError):
-            response_code = getattr(error, "response_code", None)
-            # Retry common transient status codes.
-            if response_code in {408, 429, 500, 502, 503, 504}:
-                return True
+        error_blob = f"{error.stderr} {error}".lower()
+
+        transient_markers = (
+            "rpc failed",
+            "http 500",
+            "http 502",
+            "http 503",
+            "http 504",
+            "http 429",
+            "remote end closed connection",
+            "remote end hung up unexpectedly",
+            "expected flush after ref listing",
+            "connection reset",
+            "connection timed out",
+            "operation timed out",
+            "tls handshake timeout",
+            "early eof",
+            "operation too slow",
+        )
+        return any(marker in error_blob for marker in transient_markers)
+
+    def _run_git(
+        self,
+        *args: str,
+        cwd: Path | None = None,
+        auth_header: str | None = None,
+        config: dict[str, str] | None = None,
+    ) -> str:
+        """Run a git command and return its stdout.
+
+        ``config`` entries and ``auth_header`` (as ``http.extraHeader``) are
+        passed through the environment, so credentials never appear in URLs or
+        command-line arguments.
+
+        Raises ``GitCommandFailedError`` (with credentials redacted) on a
+        non-zero exit or when ``BACKUP_GIT_TIMEOUT`` seconds elapse.
+        """
+        command = ["git", *args]
+        git_config = {**GIT_NO_CREDENTIAL_HELPER_CONFIG, **(config or {})}
+        if self.git_pack_threads:
+            git_config["pack.threads"] = str(self.git_pack_threads)
+        if auth_header:
+            git_config["http.extraHeader"] = auth_header
+
+        env = {
+            **os.environ,
+            **GIT_TRANSFER_ENV,
+            **GIT_NO_PROMPT_ENV,
+            **_git_config_env(git_config),
+        }
+
+        try:
+            result = subprocess.run(  # noqa: S603
+                command,
+                cwd=cwd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=self.git_timeout,
+                check=False,
+            )
+        except subprocess.TimeoutExpired as e:
+            stderr = e.stderr.decode(errors="replace") if e.stderr else ""
+            raise GitCommandFailedError(
+                f"Command '{_redact_credentials(' '.join(command))}' timed out "
+                f"after {self.git_timeout} seconds",
+                _redact_credentials(stderr),
+                timed_out=True,
+            ) from None
+
+        if result.returncode != 0:
+            stderr = _redact_credentials(result.stderr.strip())
+            raise GitCommandFailedError(
+                f"Command '{_redact_credentials(' '.join(command))}' failed with "
+                f"exit code {result.returncode}: {stderr}",
+                stderr,
+            )
+
+        return result.stdout
 
-            error_name = type(error).__name__.lower()
-            if "connection" in error_name or "timeout" in error_name:
-                return True
+    def _has_cached_mirror(self, mirror_path: Path) -> bool:
+        """Check for a usable mirror at ``mirror_path``, discarding broken ones."""
+        if not mirror_path.exists():
+            return False
+
+        if (mirror_path / "HEAD").is_file() and (mirror_path / "objects").is_dir():
+            return True
 
+        logger.warning("Discarding invalid cached mirror at %s", mirror_path)
+        shutil.rmtree(mirror_path, ignore_errors=True)
         return False
 
-    def _get_full_project_with_retry(
-        self, project_id: int, project_display_name: str, retries: int = 5
-    ) -> Any | None:
-        """Fetch full project details with exponential backoff."""
+    def _sync_mirror_with_retry(
+        self,
+        project: GitLabProject,
+        mirror_path: Path,
+        git_config: dict[str, str],
+        retries: int = 5,
+    ) -> None:
+        """Clone or update a GitLab mirror with exponential backoff on failures.
+
+        An existing mirror at ``mirror_path`` is updated with ``git fetch
+        --prune``; otherwise a fresh mirror clone is made.
+        """
         total_attempts = retries + 1
         base_delay_seconds = 1
+        gitlab_url = project.http_url_to_repo
 
         for attempt in range(1, total_attempts + 1):
+            is_cached = self._has_cached_mirror(mirror_path)
+
             try:
-                return self.gl.projects.get(project_id)
-            except (gitlab.GitlabError, requests.exceptions.RequestException) as e:
-                retryable = self._is_retryable_gitlab_error(e)
+                if is_cached:
+                    # Fetch from the explicit URL rather than the cached remote
+                    # config, so URL changes are always picked up.
+                    self._run_git(
+                        "fetch",
+                        "--prune",
+                        gitlab_url,
+                        "+refs/*:refs/*",
+                        cwd=mirror_path,
+                        auth_header=self._gitlab_git_auth_header,
+                        config=git_config,
+                    )
+                else:
+                    # Clone as mirror to get all refs
+                    self._run_git(
+                        "clone",
+                        "--mirror",
+                        gitlab_url,
+                        str(mirror_path),
+                        auth_header=self._gitlab_git_auth_header,
+                        config=git_config,
+                    )
+                return  # noqa: TRY300
+            except GitCommandFailedError as e:
+                retryable = self._is_retryable_git_error(e)
                 has_attempts_left = attempt < total_attempts
 
+                # Ensure the next clone attempt starts from a clean path.
+                if not is_cached:
+                    shutil.rmtree(mirror_path, ignore_errors=True)
+
                 if not retryable:
+                    if is_cached and has_attempts_left:
+                        logger.warning(
+                            "Fetch into cached mirror of %s failed (attempt %s/%s). "
+                            "Discarding the cache and cloning from scratch...",
+                            project.name,
+                            attempt,
+                            total_attempts,
+                        )
+                        logger.debug("Fetch exception details", exc_info=True)
+                        shutil.rmtree(mirror_path, ignore_errors=True)
+                        continue
+
                     logger.exception(
-                        f"Non-retryable error while loading project details for "
-                        f"'{project_display_name}' (id={project_id}). Skipping project."
+                        "Non-retryable git clone error for %s. Skipping retries.",
+                        project.name,
                     )
-                    return None
+                    raise
 
                 if has_attempts_left:
                     delay_seconds = base_delay_seconds * (2 ** (attempt - 1))
                     logger.warning(
-                        f"Transient error while loading project details for "
-                        f"'{project_display_name}' (id={project_id}) "
-                        f"(attempt {attempt}/{total_attempts}). Retrying in "
-                        f"{delay_seconds} seconds..."
+                        "Transient git clone error for %s (attempt %s/%s). "
+                        "Retrying in %s seconds...",
+                        project.name,
+                        attempt,
+                        total_attempts,
+                        delay_seconds,
                     )
-                    logger.debug("Retryable exception details", exc_info=True)
+                    logger.debug("Retryable clone exception details", exc_info=True)
                     time.sleep(delay_seconds)
                     continue
 
                 logger.exception(
-                    f"Exhausted retries while loading project details for "
-                    f"'{project_display_name}' (id={project_id}) after "
-                    f"{total_attempts} attempts. Skipping project."
+                    "Exhausted retries while cloning %s after %s attempts.",
+                    project.name,
+                    total_attempts,
                 )
-                return None
-
-        return None
-
-    def _is_retryable_clone_error(self, error: GitCommandError) -> bool:
-        """Determine whether a Git clone error appears transient."""
-        error_blob = " ".join(
-            str(part)
-            for part in (
-                getattr(error, "stderr", ""),
-                getattr(error, "stdout", ""),
-                str(error),
-            )
-        ).lower()
+                raise
 
-        transient_markers = (
-            "rpc failed",
-            "http 500",
-            "http 502",
-            "http 503",
-            "http 504",
-            "http 429",
-            "remote end closed connection",
-            "remote end hung up unexpectedly",
-            "expected flush after ref listing",
-            "connection reset",
-            "connection timed out",
-            "operation timed out",
-            "tls handshake timeout",
-            "early eof",
-        )
-        return any(marker in error_blob for marker in transient_markers)
+        msg = f"Unexpected clone retry state reached for {project.name}"
+        raise RuntimeError(msg)
 
-    def _clone_repository_with_retry(
-        self, project: Any, destination_dir: str, retries: int = 5
-    ) -> Repo:
-        """Clone a GitLab repository with exponential backoff on transient failures."""
+    def _push_mirror_with_retry(
+        self,
+        project: GitLabProject,
+        mirror_path: Path,
+        git_config: dict[str, str],
+        retries: int = 5,
+    ) -> None:
+        """Mirror-push ``mirror_path`` to GOGS with exponential backoff on failures.
+
+        Pushing to the URL directly avoids rewriting the origin remote in the
+        mirror's config. A mirror push is idempotent, so retrying is safe.
+        """
         total_attempts = retries + 1
         base_delay_seconds = 1
-        clone_path = os.path.join(destination_dir, "mirror-repo.git")  # noqa: PTH118
-        gitlab_url = project.http_url_to_repo.replace(
-            "https://", f"https://oauth2:{self.gitlab_token}@"
-        )
+        gogs_url = self._get_gogs_clone_url(project.name)
 
         for attempt in range(1, total_attempts + 1):
-            # Ensure retries always start from a clean clone path.
-            shutil.rmtree(clone_path, ignore_errors=True)
-
             try:
-                return Repo.clone_from(
-                    gitlab_url,
-                    clone_path,
-                    mirror=True,  # Clone as mirror to get all refs
+                self._run_git(
+                    "push",
+                    "--mirror",
+                    gogs_url,
+                    cwd=mirror_path,
+                    auth_header=self._gogs_git_auth_header,
+                    config=git_config,
                 )
-            except GitCommandError as e:
-                retryable = self._is_retryable_clone_error(e)
-                has_attempts_left = attempt < total_attempts
-
-                if not retryable:
+                return  # noqa: TRY300
+            except GitCommandFailedError as e:
+                if not self._is_retryable_git_error(e):
                     logger.exception(
-                        f"Non-retryable git clone error for {project.name}. "
-                        "Skipping retries."
+                        "Non-retryable git push error for %s. Skipping retries.",
+                        project.name,
                     )
                     raise
 
-                if has_attempts_left:
+                if attempt < total_attempts:
                     delay_seconds = base_delay_seconds * (2 ** (attempt - 1))
                     logger.warning(
-                        f"Transient git clone error for {project.name} "
-                        f"(attempt {attempt}/{total_attempts}). Retrying in "
-                        f"{delay_seconds} seconds..."
+                        "Transient git push error for %s (attempt %s/%s). "
+                        "Retrying in %s seconds...",
+                        project.name,
+                        attempt,
+                        total_attempts,
+                        delay_seconds,
                     )
-                    logger.debug("Retryable clone exception details", exc_info=True)
+                    logger.debug("Retryable push exception details", exc_info=True)
                     time.sleep(delay_seconds)
                     continue
 
                 logger.exception(
-                    f"Exhausted retries while cloning {project.name} after "
-                    f"{total_attempts} attempts."
+                    "Exhausted retries while pushing %s after %s attempts.",
+                    project.name,
+                    total_attempts,
                 )
                 raise
 
-        msg = f"Unexpected clone retry state reached for {project.name}"
+        msg = f"Unexpected push retry state reached for {project.name}"
         raise RuntimeError(msg)
 
     def _validate_config(self):
@@ -231,57 +709,79 @@ class GitLabToGOGSBackup:
         # Ensure GOGS URL doesn't end with slash
         self.gogs_url = self.gogs_url.rstrip("/")
 
-    def _verify_gogs_org_exists(self):
-        """Verify that the GOGS organization exists and is accessible."""
-        try:
-            endpoint = f"/orgs/{self.gogs_org}"
-            self._gogs_api_request("GET", endpoint)
-            logger.info(f"Verified organization '{self.gogs_org}' exists in GOGS")
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                raise ValueError(
-                    f"Organization '{self.gogs_org}' not found in GOGS.  Please create "
-                    "the organization first or check the organization name."
-                ) from e
-
-            if e.response.status_code == 403:
-                raise ValueError(
-                    f"Access denied to organization '{self.gogs_org}'. Please ensure "
-                    "your token has permission to access this organization."
-                ) from e
+    def _raise_gogs_org_error(self, error: requests.exceptions.HTTPError):
+        """Translate a failed GOGS organization request into a config error."""
+        if error.response.status_code == 404:
+            raise ValueError(
+                f"Organization '{self.gogs_org}' not found in GOGS.  Please create "
+                "the organization first or check the organization name."
+            ) from error
 
-            raise
+        if error.response.status_code == 403:
+            raise ValueError(
+                f"Access denied to organization '{self.gogs_org}'. Please ensure "
+                "your token has permission to access this organization."
+            ) from error
+
+        raise error
 
     def _gogs_api_request(
         self, method: str, endpoint: str, data: dict[str, Any] | None = None
     ) -> requests.Response:
         """Make a request to the GOGS API."""
         url = f"{self.gogs_url}/api/v1{endpoint}"
-        response = requests.request(
-            method=method, url=url, headers=self.gogs_headers, json=data, timeout=30
-        )
+        response = self.session.request(method=method, url=url, json=data, timeout=30)
         response.raise_for_status()
         return response
 
+    def _load_gogs_repo_set(self) -> set[str]:
+        """Fetch the names of all repositories owned by the GOGS target."""
+        if self.gogs_org:
+            endpoint = f"/orgs/{self.gogs_org}/repos"
+        else:
+            endpoint = f"/users/{self.gogs_username}/repos"
+
+        # For the authenticated user GOGS also lists collaborator and org repos,
+        # so only names under the push target's owner count as existing.
+        owner = (self.gogs_org or self.gogs_username).lower()
+        seen_full_names: set[str] = set()
+        repo_names: set[str] = set()
+        page = 1
+        while True:
+            response = self._gogs_api_request(
+                "GET", f"{endpoint}?page={page}&limit={GOGS_REPO_PAGE_LIMIT}"
+            )
+            repos = response.json() or []
+            page_full_names = {repo["full_name"].lower() for repo in repos}
+            new_names = page_full_names - seen_full_names
+            seen_full_names |= page_full_names
+            repo_names |= {
+                repo["name"].lower()
+                for repo in repos
+                if _gogs_repo_owner(repo) == owner
+            }
+
+            # Stop on a short page, or when a page adds nothing new: some GOGS
+            # versions ignore pagination and return the full list every time.
+            if len(repos) < GOGS_REPO_PAGE_LIMIT or not new_names:
+                break
+
+            page += 1
+
+        logger.info("Found %s existing repositories in GOGS", len(repo_names))
+        return repo_names
+
     def _check_gogs_repo_exists(self, repo_name: str) -> bool:
         """Check if a repository exists in GOGS."""
-        try:
-            if self.gogs_org:
-                endpoint = f"/repos/{self.gogs_org}/{repo_name}"
-            else:
-                endpoint = f"/repos/{self.gogs_username}/{repo_name}"
+        with self._gogs_repo_lock:
+            return repo_name.lower() in self._gogs_repo_set
 
-            logger.debug(f"Checking if repo exists at: {endpoint}")
-            _ = self._gogs_api_request("GET", endpoint)
-            return True  # noqa: TRY300
+    def _mark_gogs_repo_exists(self, repo_name: str):
+        """Record a repository as present in GOGS."""
+        with self._gogs_repo_lock:
+            self._gogs_repo_set.add(repo_name.lower())
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                return False
-            logger.exception("GOGS API request failed")
-            raise
-
-    def _create_gogs_repo(self, project: Any) -> dict[str, Any]:
+    def _create_gogs_repo(self, project: GitLabProject) -> dict[str, Any]:
         """Create a repository in GOGS."""
         repo_data = {
             "name": project.name,
@@ -289,160 +789,418 @@ class GitLabToGOGSBackup:
             "private": project.visibility != "public",
         }
 
-        # Create in organization if specified
-        if self.gogs_org:
-            # GOGS uses /org/{orgname}/repos format (singular 'org')
-            endpoint = f"/org/{self.gogs_org}/repos"
-            logger.info(
-                f"Creating repo in organization '{self.gogs_org}' using endpoint: "
-                f"{endpoint}"
-            )
-        else:
-            endpoint = "/user/repos"
-            logger.info(
-                f"Creating repo for user '{self.gogs_username}' using endpoint: "
-                f"{endpoint}"
-            )
-
-        logger.debug(f"Repository data: {repo_data}")
+        logger.debug(
+            "Creating repo via %s with data: %s",
+            self._gogs_create_repo_endpoint,
+            repo_data,
+        )
 
         try:
-            response = self._gogs_api_request("POST", endpoint, repo_data)
+            response = self._gogs_api_request(
+                "POST", self._gogs_create_repo_endpoint, repo_data
+            )
+            self._mark_gogs_repo_exists(project.name)
             return response.json()
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 409:
-                logger.info(f"Repository {project.name} already exists in GOGS")
+                logger.info("Repository %s already exists in GOGS", project.name)
+                self._mark_gogs_repo_exists(project.name)
                 return {"name": project.name}  # Return minimal info
 
-            if e.response.status_code == 404 and self.gogs_org:
-                logger.exception(
-                    f"Organization '{self.gogs_org}' not found or you don't have "
-                    "permission to create repos in it. Please verify: 1) Organization "
-                    "exists in GOGS, 2) Your token has org repo creation permissions"
-                )
-                raise
-
+            # Organization access was verified at startup, so no org-specific
+            # diagnosis is needed here.
             logger.exception("GOGS API request failed")
             raise
 
     def _get_gogs_clone_url(self, repo_name: str) -> str:
-        """Get the GOGS repository clone URL with authentication."""
-        if self.gogs_org:
-            repo_path = f"{self.gogs_org}/{repo_name}"
-        else:
-            repo_path = f"{self.gogs_username}/{repo_name}"
+        """Get the GOGS repository clone URL (credentials are sent as a header)."""
+        return f"{self._gogs_repo_base_url}/{repo_name}.git"
+
+    def _mirror_to_gogs(
+        self,
+        project: GitLabProject,
+        mirror_path: Path,
+        git_config: dict[str, str] | None = None,
+    ):
+        """Sync a GitLab mirror at ``mirror_path`` and push it to GOGS."""
+        git_config = git_config or {}
 
-        # Use HTTPS with token authentication
-        gogs_base = self.gogs_url.replace(
-            "https://", f"https://{self.gogs_username}:{self.gogs_token}@"
+        log_context = {"repo": project.path_with_namespace}
+
+        # Clone from GitLab (or fetch into the cached mirror)
+        logger.info(
+            "Cloning %s from GitLab...",
+            project.name,
+            extra={**log_context, "phase": "clone"},
         )
-        return f"{gogs_base}/{repo_path}.git"
+        self._sync_mirror_with_retry(
+            project,
+            mirror_path,
+            git_config,
+            retries=5,
+        )
+
+        # Check if repo exists in GOGS, create if not
+        if not self._check_gogs_repo_exists(project.name):
+            logger.info(
+                "Creating repository %s in GOGS...",
+                project.name,
+                extra={**log_context, "phase": "create"},
+            )
+            self._create_gogs_repo(project)
+
+        # Push to GOGS (mirror push to sync all refs)
+        logger.info(
+            "Pushing %s to GOGS...",
+            project.name,
+            extra={**log_context, "phase": "push"},
+        )
+        self._push_mirror_with_retry(project, mirror_path, git_config, retries=5)
+
+    def _reserve_tmpfs(self, project: GitLabProject) -> int:
+        """Reserve tmpfs space for a scratch mirror.
+
+        Returns the number of bytes reserved, or ``0`` when the mirror should
+        use the default temporary directory instead.
+        """
+        # GitLab computes statistics in the background, so a new repository can
+        # report 0 bytes; treat that as unknown rather than as tiny.
+        if self.tmpfs_dir is None or not project.repository_size:
+            return 0
+
+        if not self.tmpfs_dir.is_dir() or not os.access(self.tmpfs_dir, os.W_OK):
+            return 0
+
+        needed = project.repository_size * TMPFS_SIZE_FACTOR
+        with self._tmpfs_lock:
+            free = shutil.disk_usage(self.tmpfs_dir).free - self._tmpfs_reserved_bytes
+            if free < needed:
+                return 0
+            self._tmpfs_reserved_bytes += needed
+
+        return needed
+
+    @contextlib.contextmanager
+    def _scratch_directory(self, reserved: int) -> Iterator[str]:
+        """Yield a temporary directory, on tmpfs when ``reserved`` bytes are held.
+
+        The tmpfs reservation is released on exit.
+        """
+        scratch_root = str(self.tmpfs_dir) if reserved else None
+        try:
+            with tempfile.TemporaryDirectory(dir=scratch_root) as temp_dir:
+                yield temp_dir
+        finally:
+            if reserved:
+                with self._tmpfs_lock:
+                    self._tmpfs_reserved_bytes -= reserved
+
+    def _mirror_via_scratch(self, project: GitLabProject, reserved: int):
+        """Mirror a project through a temporary directory."""
+        with self._scratch_directory(reserved) as temp_dir:
+            self._mirror_to_gogs(
+                project,
+                Path(temp_dir) / "mirror-repo.git",
+                SCRATCH_GIT_CONFIG,
+            )
 
-    def _backup_repository(self, project: Any):
+    def _backup_repository(self, project: GitLabProject):
         """Backup a single repository from GitLab to GOGS."""
-        # Create temporary directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            try:
-                # Clone from GitLab
-                logger.info(f"Cloning {project.name} from GitLab...")
-                repo = self._clone_repository_with_retry(
-                    project,
-                    temp_dir,
-                    retries=5,
+        try:
+            if self.cache_dir is None:
+                reserved = self._reserve_tmpfs(project)
+                try:
+                    self._mirror_via_scratch(project, reserved)
+                except (GitCommandFailedError, OSError) as e:
+                    if not reserved or not _is_out_of_space_error(e):
+                        raise
+
+                    # The size estimate can be wrong (e.g. stale statistics),
+                    # so a tmpfs that fills up must not fail the backup.
+                    logger.warning(
+                        "Tmpfs ran out of space while backing up %s. Retrying "
+                        "once in the default temporary directory...",
+                        project.name,
+                    )
+                    logger.debug("Tmpfs backup exception details", exc_info=True)
+                    self._mirror_via_scratch(project, 0)
+            else:
+                mirror_path = self.cache_dir / f"{project.id}.git"
+                self._mirror_to_gogs(project, mirror_path)
+                # Mark as recently used for cache eviction
+                os.utime(mirror_path)
+
+            logger.info(
+                "Successfully backed up %s",
+                project.name,
+                extra={"repo": project.path_with_namespace, "phase": "done"},
+            )
+
+        except GitCommandFailedError:
+            logger.exception("Git error while backing up %s", project.name)
+            raise
+
+        except Exception:
+            logger.exception("Failed to backup %s", project.name)
+            raise
+
+    def _enforce_cache_budget(self):
+        """Evict least recently used cached mirrors until under the size budget."""
+        if self.cache_dir is None or not self.cache_max_bytes:
+            return
+
+        mirrors = []
+        for mirror_path in self.cache_dir.glob("*.git"):
+            size = sum(f.stat().st_size for f in mirror_path.rglob("*") if f.is_file())
+            mirrors.append((mirror_path.stat().st_mtime, size, mirror_path))
+
+        total_size = sum(size for _, size, _ in mirrors)
+        for _, size, mirror_path in sorted(mirrors):
+            if total_size <= self.cache_max_bytes:
+                break
+
+            logger.info("Evicting cached mirror %s (%s bytes)", mirror_path.name, size)
+            shutil.rmtree(mirror_path, ignore_errors=True)
+            total_size -= size
+
+    def _load_backup_state(self) -> dict[str, dict[str, str]]:
+        """Load the per-project backup watermarks from the state file."""
+        if not self.state_path.exists():
+            return {}
+
+        try:
+            with self.state_path.open(encoding="utf-8") as f:
+                state = json.load(f)
+        except OSError, json.JSONDecodeError:
+            logger.warning(
+                "Could not read backup state from %s. Backing up every project.",
+                self.state_path,
+            )
+            logger.debug("Backup state read error details", exc_info=True)
+            return {}
+
+        if not isinstance(state, dict):
+            logger.warning(
+                "Ignoring malformed backup state in %s. Backing up every project.",
+                self.state_path,
+            )
+            return {}
+
+        return state
+
+    def _save_backup_state(self, state: dict[str, dict[str, str]]):
+        """Atomically write the per-project backup watermarks."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.state_path.parent, prefix=".backup_state.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.state_path)  # noqa: PTH105
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def _is_project_unchanged(
+        self, project: GitLabProject, state: dict[str, dict[str, str]]
+    ) -> bool:
+        """Check whether a project has no activity since its last backup.
+
+        A watermark only counts if it was recorded for the current GOGS
+        destination and the repository still exists there.
+        """
+        entry = state.get(str(project.id))
+        last_activity_at = project.last_activity_at
+        if not entry or not last_activity_at:
+            return False
+
+        if entry.get("destination") != self._gogs_repo_base_url:
+            return False
+
+        if not self._check_gogs_repo_exists(project.name):
+            return False
+
+        try:
+            current_activity = _parse_gitlab_timestamp(last_activity_at)
+            recorded_activity = _parse_gitlab_timestamp(entry["last_activity_at"])
+            backed_up_at = _parse_gitlab_timestamp(entry["backed_up_at"])
+        except KeyError, TypeError, ValueError:
+            return False
+
+        if current_activity != recorded_activity:
+            return False
+
+        # Because of GitLab's update throttle, the watermark is only trusted
+        # once a backup started after the throttle window had closed.
+        return backed_up_at >= current_activity + GITLAB_ACTIVITY_THROTTLE
+
+    def _iter_group_projects(self, group_full_path: str) -> Iterator[GitLabProject]:
+        """Yield non-archived projects of a group (and subgroups) via GraphQL."""
+        cursor = None
+        while True:
+            result = self.gl.http_post(
+                f"{self.gitlab_url}/api/graphql",
+                post_data={
+                    "query": GITLAB_PROJECTS_QUERY,
+                    "variables": {
+                        "fullPath": group_full_path,
+                        "first": GITLAB_PROJECTS_PER_PAGE,
+                        "after": cursor,
+                    },
+                },
+            )
+
+            # Fields the token may not read (e.g. statistics) come back as null
+            # with an error, so only fail when the project list itself is missing.
+            errors = "; ".join(
+                error.get("message", str(error)) for error in result.get("errors", [])
+            )
+            group_data = (result.get("data") or {}).get("group") or {}
+            projects = group_data.get("projects")
+            if projects is None:
+                raise gitlab.GitlabError(
+                    f"Could not list projects of GitLab group '{group_full_path}' "
+                    f"via GraphQL: {errors or 'group not found'}"
                 )
 
-                # Check if repo exists in GOGS, create if not
-                if not self._check_gogs_repo_exists(project.name):
-                    logger.info(f"Creating repository {project.name} in GOGS...")
-                    self._create_gogs_repo(project)
+            if errors:
+                logger.warning("GitLab GraphQL returned partial data: %s", errors)
 
-                # Update remote to GOGS
-                logger.info("Updating remote to GOGS...")
-                if "origin" in [r.name for r in repo.remotes]:
-                    repo.delete_remote(repo.remotes.origin)
+            for node in projects["nodes"]:
+                if node.get("archived"):
+                    continue  # Skip archived projects
+                yield GitLabProject.from_graphql(node)
 
-                gogs_url = self._get_gogs_clone_url(project.name)
-                origin = repo.create_remote("origin", gogs_url)
+            page_info = projects["pageInfo"]
+            if not page_info["hasNextPage"]:
+                return
+            cursor = page_info["endCursor"]
 
-                # Push to GOGS (mirror push to sync all refs)
-                logger.info(f"Pushing {project.name} to GOGS...")
-                origin.push(mirror=True)
+    def _backup_project(
+        self, project: GitLabProject, progress_label: str
+    ) -> str | None:
+        """Back up one project listed from the GitLab group.
 
-                logger.info(f"Successfully backed up {project.name}")
+        Returns ``None`` on success, or an error message on failure.
+        """
+        logger.info(
+            "%s Starting backup of %s",
+            progress_label,
+            project.path_with_namespace,
+            extra={"repo": project.path_with_namespace, "phase": "start"},
+        )
 
-            except GitCommandError:
-                logger.exception(f"Git error while backing up {project.name}")
-                raise
+        try:
+            self._backup_repository(project)
+        except Exception as e:
+            logger.exception(
+                "Failed to backup %s",
+                project.name,
+                extra={"repo": project.path_with_namespace, "phase": "failed"},
+            )
+            return str(e)
 
-            except Exception:
-                logger.exception(f"Failed to backup {project.name}")
-                raise
+        return None
 
     def run(self):
         """Run the backup process for all repositories in the GitLab group."""
         try:
             # Get GitLab group
             group = self.gl.groups.get(self.gitlab_group_id)
-            logger.info(f"Found GitLab group: {group.name}")
+            logger.info("Found GitLab group: %s", group.name)
 
-            # Get all projects in the group (including subgroups)
-            projects = group.projects.list(
-                all=True,
-                include_subgroups=True,
-                archived=False,  # Skip archived projects
-            )
+            # Stream all projects in the group (including subgroups) page by
+            # page instead of buffering the whole listing up front.
+            projects = self._iter_group_projects(group.full_path)
 
-            logger.info(f"Found {len(projects)} projects to backup")
+            run_started_at = datetime.now(UTC).isoformat()
+            state = self._load_backup_state()
 
             # Track results
+            listed_ids: set[str] = set()
+            skipped_count = 0
+            empty_count = 0
             successful = []
             failed = []
 
-            # Backup each repository
-            for idx, project in enumerate(projects):
-                logger.info("")  # Visual Spacing
-                project_display_name = (
-                    getattr(project, "path_with_namespace", None)
-                    or getattr(project, "name", None)
-                    or str(project.id)
-                )
-
-                # Get full project details with retries for transient failures
-                full_project = self._get_full_project_with_retry(
-                    project.id,
-                    project_display_name,
-                    retries=5,
-                )
-                if full_project is None:
-                    failed.append(
-                        (
-                            project_display_name,
-                            "Failed to load project details after retries",
-                        )
+            # Backup repositories in parallel; network-bound git clone/push
+            # operations dominate each backup. Projects are submitted while the
+            # listing is still paginating, so backups start with the first page.
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="backup"
+            ) as executor:
+                futures = {}
+                for idx, project in enumerate(projects, start=1):
+                    listed_ids.add(str(project.id))
+
+                    # Empty repositories have no refs to mirror
+                    if project.empty_repo:
+                        empty_count += 1
+                        continue
+
+                    # Skip projects with no GitLab activity since their last backup
+                    if not self.force_full_backup and self._is_project_unchanged(
+                        project, state
+                    ):
+                        skipped_count += 1
+                        continue
+
+                    future = executor.submit(
+                        self._backup_project,
+                        project,
+                        f"[{idx:03d}]",
                     )
-                    continue
+                    futures[future] = project
 
+                logger.info("Found %s projects in GitLab group", len(listed_ids))
+                logger.info("Skipping %s empty repositories", empty_count)
                 logger.info(
-                    f"[{idx + 1:03d}/{len(projects):03d}] Starting backup of "
-                    f"{full_project.path_with_namespace}"
+                    "Skipping %s projects unchanged since their last backup",
+                    skipped_count,
                 )
+                logger.info("Queued %s projects for backup", len(futures))
+
+                for future in as_completed(futures):
+                    project = futures[future]
+                    error = future.result()
+                    if error is None:
+                        successful.append(project.name)
+                        if project.last_activity_at:
+                            state[str(project.id)] = {
+                                "last_activity_at": project.last_activity_at,
+                                "backed_up_at": run_started_at,
+                                "destination": self._gogs_repo_base_url,
+                            }
+                    else:
+                        failed.append((project.name, error))
+
+            # Drop watermarks of projects no longer in the group
+            state = {
+                project_id: entry
+                for project_id, entry in state.items()
+                if project_id in listed_ids
+            }
 
-                try:
-                    self._backup_repository(full_project)
-                    successful.append(full_project.name)
-                except Exception as e:
-                    logger.exception(f"Failed to backup {full_project.name}")
-                    failed.append((full_project.name, str(e)))
+            try:
+                self._save_backup_state(state)
+            except OSError:
+                logger.exception("Failed to save backup state to %s", self.state_path)
+
+            try:
+                self._enforce_cache_budget()
+            except OSError:
+                logger.exception("Failed to enforce cache budget in %s", self.cache_dir)
 
             # Summary
-            logger.info("\nBackup Summary:")
-            logger.info(f"Successful: {len(successful)} repositories")
-            logger.info(f"Failed: {len(failed)} repositories")
+            logger.info("Backup Summary:")
+            logger.info("Successful: %s repositories", len(successful))
+            logger.info("Failed: %s repositories", len(failed))
 
             if failed:
-                logger.error("\nFailed repositories:")
+                logger.error("Failed repositories:")
                 for repo_name, error in failed:
-                    logger.error(f"  - {repo_name}: {error}")
+                    logger.error("  - %s: %s", repo_name, error)
 
                 # Exit with error code if any backups failed
                 sys.exit(1)
@@ -458,16 +1216,22 @@ class GitLabToGOGSBackup:
 
 def main():
     """Main entry point."""
-    logger.info("Starting GitLab to GOGS backup process...")
-
+    log_listener = _configure_logging()
     try:
-        backup = GitLabToGOGSBackup()
-        backup.run()
-        logger.info("Backup process completed successfully!")
+        logger.info("Starting GitLab to GOGS backup process...")
+
+        try:
+            backup = GitLabToGOGSBackup()
+            backup.run()
+            logger.info("Backup process completed successfully!")
+
+        except Exception:
+            logger.exception("Backup process failed")
+            sys.exit(1)
 
-    except Exception:
-        logger.exception("Backup process failed")
-        sys.exit(1)
+    finally:
+        # Flush queued records before the process exits
+        log_listener.stop()
 
 
 if __name__ == "__main__":